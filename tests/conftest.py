@@ -0,0 +1,46 @@
+import os
+import pytest
+from unittest import mock
+
+TEST_DB = "vynn_test"
+
+@pytest.fixture(scope="session")
+def mongo_client():
+    """
+    A real mongod shared by the whole session (real BSON codec and query planner).
+    
+    Uses VYNN_TEST_MONGO_URI when set (its vynn_test database is wiped between tests),
+    otherwise an ephemeral pymongo_inmemory server, which downloads mongod on first use.
+    DAO tests are skipped when neither is available, e.g. offline.
+    """
+    uri = os.getenv("VYNN_TEST_MONGO_URI")
+    try:
+        if uri:
+            import pymongo
+            client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=5000)
+            client.admin.command("ping")
+        else:
+            import pymongo_inmemory
+            client = pymongo_inmemory.MongoClient()
+    except Exception as e:
+        pytest.skip(f"No MongoDB server for DAO tests (set VYNN_TEST_MONGO_URI): {e}")
+    yield client
+    client.close()
+
+@pytest.fixture
+def mongo_db(mongo_client):
+    """Point vynn_core at the test database and reset it after each test."""
+    from vynn_core.dao import articles
+    from vynn_core.db import mongo
+
+    with mock.patch("vynn_core.db.mongo.get_mongo_client", new=lambda: mongo_client), \
+         mock.patch("vynn_core.db.mongo.MONGO_DB", TEST_DB):
+        yield mongo_client[TEST_DB]
+
+    db = mongo_client[TEST_DB]
+    for name in db.list_collection_names():
+        db.drop_collection(name)
+    articles._indexed_collections.clear()
+    articles._indexes_ready.clear()
+    mongo.get_collection.cache_clear()
+    articles.find_recent.cache_clear()
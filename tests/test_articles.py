@@ -1,24 +1,298 @@
-import mongomock
 import pytest
-from vynn_core.dao.articles import upsert_articles, get_articles_by_ids
-from vynn_core.db.mongo import get_db, init_indexes
+from datetime import datetime, timedelta
+from bson import ObjectId
+from vynn_core import models
+from vynn_core.dao import articles
+from vynn_core.dao.articles import FEED_PROJECTION, backfill_url_hashes, migrate_publish_dates, get_last_n_hours_news, iter_last_n_hours_news, upsert_articles, upsert_articles_iter, get_articles_by_ids, find_recent, iter_recent, get_articles_by_urls
+from vynn_core.db.mongo import drop_retired_indexes, get_db, init_indexes
+from vynn_core.feed.ranking import compute_scores_batch
+from vynn_core.models import Article
+from vynn_core.utils import hashing
+from vynn_core.utils.hashing import url_hash
 from vynn_core.utils.time import utc_now
-from unittest import mock
 
-@mock.patch("vynn_core.db.mongo.get_mongo_client", new=lambda: mongomock.MongoClient())
-def test_upsert_articles():
-    init_indexes()
-    article = {
-        "url": "https://example.com/a",
-        "title": "Example",
+pytestmark = pytest.mark.usefixtures("mongo_db")
+
+def _article(url="https://example.com/a", title="Example"):
+    return {
+        "url": url,
+        "title": title,
         "summary": "...",
         "source": "Example",
         "publishedAt": utc_now(),
         "entities": {"tickers": ["AAPL"], "keywords": ["earnings"]},
         "quality": {"llmScore": 0.82, "reason": "Keyword & recency"}
     }
-    res = upsert_articles([article])
+
+def test_upsert_articles():
+    init_indexes()
+    article = _article()
+    res = upsert_articles([article], "articles")
     assert len(res["created"]) == 1
     ids = res["created"] + res["updated"]
-    fetched = get_articles_by_ids(ids)
+    fetched = get_articles_by_ids(ids + ["not-an-id", None], "articles")
     assert fetched[0]["title"] == "Example"
+
+def test_upsert_articles_updates_existing():
+    init_indexes()
+    first = upsert_articles([_article()], "articles")
+    res = upsert_articles([_article(title="Edited"), _article(url="https://example.com/b")], "articles")
+    assert len(res["created"]) == 1
+    assert res["updated"] == first["created"]
+    assert get_articles_by_ids(res["updated"], "articles")[0]["title"] == "Edited"
+
+def test_upsert_articles_ensures_indexes():
+    upsert_articles([_article()], "fresh")
+    indexes = get_db()["fresh"].index_information()
+    assert {"urlHash_unique", "pubdate_id_desc"} <= set(indexes)
+
+def test_drop_retired_indexes():
+    get_db()["articles"].create_index([("publishedAt", -1)], name="publishedAt_desc")
+    # Readers ensure indexes lazily, so that path must never drop any
+    init_indexes()
+    assert "publishedAt_desc" in get_db()["articles"].index_information()
+    assert drop_retired_indexes() == ["publishedAt_desc"]
+    assert "publishedAt_desc" not in get_db()["articles"].index_information()
+
+def test_get_articles_by_ids_projection():
+    res = upsert_articles([_article()], "articles")
+    fetched = get_articles_by_ids(res["created"], "articles", projection={"title": 1})
+    assert set(fetched[0]) == {"_id", "title"}
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_upsert_articles_skips_docs_without_url(monkeypatch, workers):
+    # Serial and partitioned upserts accept and reject exactly the same documents
+    monkeypatch.setattr(articles, "BULK_CHUNK_SIZE", 2)
+    docs = [{"title": "No URL"}, {"url": None}, "not a document", _article(), {"url": 42}]
+    res = upsert_articles(docs, "articles", workers=workers)
+    assert len(res["created"]) == 1
+    assert res["skipped"] == ["unknown"] * 4
+
+def test_upsert_articles_unacknowledged():
+    res = upsert_articles([_article(), _article(url="https://example.com/b")], "articles", ack=False)
+    assert res == {"submitted": 2, "skipped": 0}
+
+def test_upsert_articles_collapses_duplicates():
+    res = upsert_articles([_article(title="First"), _article(title="Second")], "articles")
+    assert len(res["created"]) == 1
+    assert get_articles_by_ids(res["created"], "articles")[0]["title"] == "Second"
+
+def test_upsert_articles_does_not_mutate_input():
+    article = _article()
+    before = dict(article)
+    res = upsert_articles([article], "articles")
+    assert article == before
+    stored = get_articles_by_ids(res["created"], "articles")[0]
+    assert stored["createdAt"] == stored["updatedAt"]
+
+def test_find_recent_cache():
+    upsert_articles([_article()], "articles")
+    first = find_recent("articles")
+    first[0]["title"] = "Mutated"
+    get_db()["articles"].update_many({}, {"$set": {"title": "Changed"}})
+    assert find_recent("articles")[0]["title"] == "Example"
+    upsert_articles([_article(url="https://example.com/b")], "articles")
+    assert len(find_recent("articles")) == 2
+
+def test_feed_projection_keeps_ranking_fields():
+    upsert_articles([
+        dict(_article(url="https://example.com/new"), publishedAt=utc_now() - timedelta(minutes=10)),
+        dict(_article(url="https://example.com/old"), publishedAt=utc_now() - timedelta(hours=10)),
+    ], "articles")
+    docs = {doc["url"]: doc for doc in find_recent("articles", projection=FEED_PROJECTION)}
+    assert "summary" not in docs["https://example.com/new"]
+    new, old = compute_scores_batch([docs["https://example.com/new"], docs["https://example.com/old"]],
+                                    utc_now().timestamp())
+    # Same llmScore, so only recency can separate them
+    assert new > old > 0
+
+def test_find_recent_cache_refresh_keeps_live_entries(monkeypatch):
+    monkeypatch.setattr(articles, "_RECENT_CACHE_MAXSIZE", 2)
+    upsert_articles([_article()], "articles")
+    find_recent("articles", limit=1)
+    find_recent("articles", limit=2)
+    # Expire everything, then refresh one key: the cache is full but must not evict the other
+    monkeypatch.setattr(articles, "RECENT_CACHE_TTL", 0)
+    find_recent("articles", limit=2)
+    assert sorted(key[1] for key in articles._recent_cache) == [1, 2]
+    find_recent("articles", limit=3)
+    assert sorted(key[1] for key in articles._recent_cache) == [2, 3]
+
+def test_iter_recent_streams_newest_first():
+    upsert_articles([
+        dict(_article(url="https://example.com/old"), publish_date="2025-01-01T00:00:00"),
+        dict(_article(url="https://example.com/new"), publish_date="2025-01-02T00:00:00"),
+    ], "articles")
+    cursor = iter_recent("articles", limit=5)
+    assert next(cursor)["url"] == "https://example.com/new"
+
+def test_find_recent_keyset_pagination():
+    upsert_articles([
+        dict(_article(url=f"https://example.com/{i}"), publish_date=f"2025-01-0{1 + i // 2}T00:00:00")
+        for i in range(5)
+    ], "articles")
+    seen = []
+    page = find_recent("articles", limit=2)
+    while page:
+        seen.extend(a["url"] for a in page)
+        last = page[-1]
+        page = find_recent("articles", limit=2, cursor=(last["publish_date"], last["_id"]))
+    assert sorted(seen) == [f"https://example.com/{i}" for i in range(5)]
+    assert seen[0] == "https://example.com/4"
+
+def test_upsert_articles_accepts_models():
+    res = upsert_articles([Article(**_article()), _article(url="https://example.com/b")], "articles")
+    assert len(res["created"]) == 2
+    stored = get_articles_by_ids(res["created"], "articles")
+    assert all(doc["createdAt"] is not None for doc in stored)
+
+def test_fast_dump_matches_model_dump(monkeypatch):
+    article = models.Article(**_article())
+    expected = article.to_mongo_dict()
+    monkeypatch.setattr(models, "FAST_DUMP", True)
+    assert article.to_mongo_dict() == expected
+    assert models.Article.to_mongo_dicts([article]) == [expected]
+
+def test_get_articles_by_urls():
+    upsert_articles([_article(), _article(url="https://example.com/b", title="B")], "articles")
+    found = get_articles_by_urls(
+        ["https://example.com/b?utm_source=x", "https://example.com/missing"], "articles", projection={"title": 1}
+    )
+    assert found["https://example.com/b?utm_source=x"]["title"] == "B"
+    assert found["https://example.com/missing"] is None
+    excluded = get_articles_by_urls(["https://example.com/b"], "articles", projection={"summary": 0, "urlHash": 0})
+    assert excluded["https://example.com/b"]["title"] == "B"
+    assert "summary" not in excluded["https://example.com/b"]
+    # "Which URLs exist?" with an _id-only projection
+    ids_only = get_articles_by_urls(["https://example.com/b", "https://example.com/missing"], "articles", projection={"_id": 1})
+    assert ids_only["https://example.com/b"]["_id"] is not None
+    assert ids_only["https://example.com/missing"] is None
+    assert get_articles_by_urls([None, "https://example.com/b"], "articles") == {None: None, "https://example.com/b": None}
+
+def test_upsert_articles_iter_yields_per_chunk():
+    docs = (_article(url=f"https://example.com/{i}") for i in range(5))
+    results = list(upsert_articles_iter(docs, "articles", chunk_size=2))
+    assert [len(r["created"]) for r in results] == [2, 2, 1]
+
+def test_upsert_articles_partial_failure():
+    upsert_articles([_article()], "articles")
+    # Rewriting _id of the stored article fails server-side without aborting the batch
+    res = upsert_articles([dict(_article(), _id=ObjectId()), _article(url="https://example.com/b")], "articles")
+    assert res["skipped"] == [url_hash("https://example.com/a")]
+    assert len(res["created"]) == 1
+
+def test_upsert_articles_parallel_workers(monkeypatch):
+    monkeypatch.setattr(articles, "BULK_CHUNK_SIZE", 2)
+    upsert_articles([_article(url="https://example.com/0")], "articles")
+    docs = [_article(url=f"https://example.com/{i}") for i in range(7)] + [{"title": "No URL"}]
+    docs.append(_article(url="https://example.com/6?utm_source=x", title="Last"))
+    url_hash.cache_clear()
+    res = upsert_articles(docs, "articles", workers=3)
+    assert len(res["created"]) == 6 and res["skipped"] == ["unknown"]
+    assert get_db()["articles"].count_documents({}) == 7
+    # Ingest URLs are hashed as one batch, never through url_hash's LRU cache
+    assert url_hash.cache_info().currsize == 0
+    assert get_articles_by_urls(["https://example.com/6"], "articles")["https://example.com/6"]["title"] == "Last"
+
+def test_upsert_articles_without_id_resolution():
+    upsert_articles([_article()], "articles")
+    res = upsert_articles([_article(url="https://example.com/b"), _article()], "articles", resolve_ids=False)
+    assert res["updated"] == [url_hash("https://example.com/a")]
+    assert len(res["created"]) == 1
+
+class FakeSeenRedis:
+    """Just enough of a Redis client (sets, EXPIRE, pipelines) for the seen-set checks."""
+    def __init__(self):
+        self.sets, self.ttls, self.calls = {}, {}, []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def smismember(self, key, values):
+        self.calls.append([int(v in self.sets.get(key, ())) for v in values])
+
+    def sadd(self, key, *values):
+        self.sets.setdefault(key, set()).update(values)
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return calls
+
+def test_upsert_articles_skip_seen(monkeypatch):
+    redis_client = FakeSeenRedis()
+    monkeypatch.setattr(articles, "get_redis_client", lambda: redis_client)
+    first = upsert_articles([_article()], "articles", skip_seen=True)
+    assert len(first["created"]) == 1
+    res = upsert_articles([_article(title="Edited"), _article(url="https://example.com/b")], "articles", skip_seen=True)
+    assert res["skipped"] == [url_hash("https://example.com/a")]
+    assert len(res["created"]) == 1 and res["updated"] == []
+    (key, members), = redis_client.sets.items()
+    assert key.startswith("seen:urlhash:vynn_test.articles:")
+    assert members == {url_hash("https://example.com/a"), url_hash("https://example.com/b")}
+    assert redis_client.ttls[key] == 2 * articles.SEEN_PERIOD_SECONDS
+    upsert_articles([_article(url="https://example.com/c")], "articles", skip_seen=True, ack=False)
+    assert url_hash("https://example.com/c") not in members
+
+def test_skip_seen_is_scoped_per_collection_and_period(monkeypatch):
+    redis_client = FakeSeenRedis()
+    monkeypatch.setattr(articles, "get_redis_client", lambda: redis_client)
+    upsert_articles([_article()], "articles", skip_seen=True)
+    # Another collection has its own seen set
+    assert len(upsert_articles([_article()], "archive", skip_seen=True)["created"]) == 1
+    # Hashes seen last period are still skipped, older ones are forgotten
+    now = articles.time.time()
+    monkeypatch.setattr(articles.time, "time", lambda: now + articles.SEEN_PERIOD_SECONDS)
+    assert upsert_articles([_article()], "articles", skip_seen=True)["skipped"] == [url_hash("https://example.com/a")]
+    monkeypatch.setattr(articles.time, "time", lambda: now + 3 * articles.SEEN_PERIOD_SECONDS)
+    assert len(upsert_articles([_article()], "articles", skip_seen=True)["updated"]) == 1
+
+def test_backfill_url_hashes():
+    get_db()["articles"].insert_many([
+        {"url": "https://example.com/a", "urlHash": "stale"},
+        {"url": "https://example.com/b", "urlHash": url_hash("https://example.com/b")},
+    ])
+    assert backfill_url_hashes("articles") == 1
+    assert get_db()["articles"].find_one({"url": "https://example.com/a"})["urlHash"] == url_hash("https://example.com/a")
+
+def test_backfill_url_hashes_skips_collisions():
+    init_indexes()
+    get_db()["articles"].insert_many([
+        {"url": "https://example.com/a", "urlHash": "stale-1"},
+        {"url": "https://example.com/a?utm_source=x", "urlHash": "stale-2"},
+        {"url": "https://example.com/b", "urlHash": "stale-3"},
+    ])
+    assert backfill_url_hashes("articles") == 2
+    assert get_db()["articles"].find_one({"url": "https://example.com/b"})["urlHash"] == url_hash("https://example.com/b")
+
+def test_binary_url_hash_format(monkeypatch):
+    get_db()["articles"].insert_one({"url": "https://example.com/a", "urlHash": url_hash("https://example.com/a")})
+    monkeypatch.setattr(hashing, "URL_HASH_FORMAT", "binary")
+    assert backfill_url_hashes("articles") == 1
+    assert get_db()["articles"].find_one()["urlHash"] == bytes.fromhex(url_hash("https://example.com/a"))
+    res = upsert_articles([_article(), _article(url="https://example.com/b")], "articles")
+    assert len(res["created"]) == 1 and len(res["updated"]) == 1
+    stored = get_articles_by_urls(["https://example.com/b"], "articles")["https://example.com/b"]
+    assert stored["title"] == "Example"
+    # Fetch, edit, upsert round trip with the bytes urlHash the read returned
+    res = upsert_articles([dict(stored, title="Edited")], "articles")
+    assert res["updated"] == [str(stored["_id"])] and res["skipped"] == []
+
+def test_publish_date_stored_as_date():
+    recent = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+    upsert_articles([
+        dict(_article(url="https://example.com/old"), publish_date="2020-01-01T00:00:00"),
+        dict(_article(url="https://example.com/new"), publish_date=recent),
+    ], "articles")
+    assert isinstance(get_db()["articles"].find_one()["publish_date"], datetime)
+    assert [a["url"] for a in get_last_n_hours_news("articles", 24)] == ["https://example.com/new"]
+    assert "summary" not in get_last_n_hours_news("articles", 24, projection=FEED_PROJECTION)[0]
+    assert [a["url"] for a in iter_last_n_hours_news("articles", 24)] == ["https://example.com/new"]
+    assert [a["url"] for a in find_recent("articles", before_date="2021-01-01T00:00:00")] == ["https://example.com/old"]
+
+def test_migrate_publish_dates():
+    get_db()["articles"].insert_one({"url": "https://example.com/a", "publish_date": "2025-11-01T15:56:39.542998"})
+    assert migrate_publish_dates("articles") == 1
+    assert get_db()["articles"].find_one()["publish_date"] == datetime(2025, 11, 1, 15, 56, 39, 542000)
@@ -0,0 +1,55 @@
+import pytest
+import threading
+import time
+from unittest import mock
+from vynn_core.db import mongo
+
+@pytest.fixture
+def cold_client(monkeypatch):
+    """Start from a process that has not connected yet, and forget the fake client afterwards."""
+    monkeypatch.setattr(mongo, "_mongo_client", None)
+    mongo.get_mongo_client.cache_clear()
+    yield
+    mongo.get_mongo_client.cache_clear()
+
+def test_get_mongo_client_closes_client_on_failed_ping(cold_client):
+    client = mock.MagicMock()
+    client.admin.command.side_effect = ConnectionError("unreachable")
+    with mock.patch.object(mongo, "MongoClient", return_value=client):
+        with pytest.raises(ConnectionError):
+            mongo.get_mongo_client()
+    client.close.assert_called_once()
+    assert mongo.get_mongo_client.cache_info().currsize == 0
+
+def test_get_mongo_client_builds_one_client_under_concurrency(cold_client):
+    built = []
+    def slow_client(*args, **kwargs):
+        time.sleep(0.05)
+        built.append(mock.MagicMock())
+        return built[-1]
+
+    start = threading.Barrier(8)
+    results = []
+    def worker():
+        start.wait()
+        results.append(mongo.get_mongo_client())
+
+    with mock.patch.object(mongo, "MongoClient", side_effect=slow_client):
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(built) == 1
+    assert all(client is built[0] for client in results) and len(results) == 8
+
+@pytest.mark.parametrize("uri, expected", [
+    ("mongodb://localhost/?compressors=snappy", {}),
+    ("mongodb+srv://user:pw@cluster.example.net/?retryWrites=true&Compressors=zstd", {}),
+    ("mongodb://localhost/?retryWrites=true", {"compressors": "zlib"}),
+])
+def test_client_options_respect_uri_compressors(monkeypatch, uri, expected):
+    monkeypatch.setattr(mongo, "MONGO_URI", uri)
+    monkeypatch.setattr(mongo, "MONGO_COMPRESSORS", None)
+    monkeypatch.setattr(mongo.importlib.util, "find_spec", lambda name: name == "zlib" or None)
+    assert mongo._client_options() == expected
@@ -0,0 +1,43 @@
+import pytest
+from vynn_core.feed import fanout
+
+class FakePipeline:
+    def __init__(self):
+        self.buffered = []
+        self.executed = []
+
+    def zadd(self, key, mapping):
+        self.buffered.append((key, mapping))
+
+    def execute(self):
+        self.executed.append(self.buffered)
+        self.buffered = []
+
+class FakeRedis:
+    def __init__(self):
+        self.pipe = FakePipeline()
+
+    def pipeline(self, transaction=True):
+        assert transaction is False
+        return self.pipe
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(fanout, "get_redis_client", lambda: client)
+    monkeypatch.setattr(fanout, "FANOUT_BATCH_SIZE", 2)
+    return client
+
+def test_push_executes_once_per_batch(redis_client):
+    fanout.push("a1", ["u1", "u2", "u3", "u4", "u5"], score=1.5)
+    assert [len(batch) for batch in redis_client.pipe.executed] == [2, 2, 1]
+    assert redis_client.pipe.executed[2] == [("feed:u5", {"a1": 1.5})]
+
+def test_push_without_users_sends_nothing(redis_client):
+    fanout.push("a1", [])
+    assert redis_client.pipe.executed == []
+
+def test_push_scores(redis_client):
+    fanout.push("a1", ["u1"], score=0.0)
+    fanout.push("a2", ["u1"])
+    assert [batch[0][1] for batch in redis_client.pipe.executed] == [{"a1": 0.0}, {"a2": 0}]
@@ -4,6 +4,7 @@ Simple test script to verify vynn_core functionality without requiring MongoDB.
 """
 
 import logging
+import traceback
 from datetime import datetime
 from pprint import pprint
 
@@ -75,7 +76,6 @@ def test_models_and_utils():
         
     except Exception as e:
         print(f"❌ Error in model/utility tests: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -151,7 +151,6 @@ def test_article_serialization():
         
     except Exception as e:
         print(f"❌ Error in serialization tests: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -221,7 +220,6 @@ def simulate_scraper_integration():
         
     except Exception as e:
         print(f"❌ Error in scraper integration simulation: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -0,0 +1,48 @@
+import pytest
+import re
+import string
+from urllib.parse import parse_qsl, urlencode
+from vynn_core.utils.hashing import url_hash, url_hashes, _canonicalize, _canonicalize_slow, _STABLE_ESCAPE
+
+# Stored urlHash values must not change, so the regex fast path has to agree
+# with the full urlparse/parse_qsl canonicalization on every input.
+URLS = [
+    "https://example.com/article",
+    "https://example.com/article?utm_source=twitter",
+    "https://example.com/article?utm_campaign=test&utm_source=facebook",
+    "https://example.com/article?param=value&utm_source=google",
+    "https://example.com/article?UTM_Source=x&q=a+b#section",
+    "https://example.com/article?",
+    "https://example.com/article#",
+    "https://example.com/article;params?x=1",
+    "https://example.com/article?a=%41&b",
+    "https://example.com/article?a=&b=1",
+    "HTTPS://Example.com/article",
+    "https://[::1]/article?utm_medium=x",
+    "http:////example.com",
+    "https://example.com/r?url=https%3A%2F%2Fexample.com%2Fa&utm_source=x",
+    "https://example.com/r?q=%2f&r=%41&s=%20&t=%5F",
+    "https://example.com/r?utm%5Fsource=x&q=caf%C3%A9",
+]
+
+@pytest.mark.parametrize("url", URLS)
+def test_fast_canonicalization_matches_full_parse(url):
+    assert _canonicalize(url) == _canonicalize_slow(url)
+
+def test_utm_params_do_not_change_hash():
+    assert url_hash("https://example.com/a?utm_source=x&id=1") == url_hash("https://example.com/a?id=1")
+
+def test_url_hashes_matches_url_hash():
+    assert url_hashes(URLS) == [url_hash(url) for url in URLS]
+
+def test_stable_escapes_round_trip_through_urlencode():
+    stable = {f"%{b:02X}" for b in range(0x80) if chr(b) not in string.ascii_letters + string.digits + "_.-~ "}
+    matched = {f"%{b:02X}" for b in range(0x100) if re.fullmatch(_STABLE_ESCAPE, f"%{b:02X}")}
+    assert matched == stable
+    for escape in stable:
+        assert urlencode(parse_qsl(f"k={escape}")) == f"k={escape}"
+
+def test_url_hash_is_memoized():
+    url_hash.cache_clear()
+    assert url_hash("https://example.com/top") == url_hash("https://example.com/top")
+    assert url_hash.cache_info().hits == 1
@@ -6,6 +6,7 @@ Run this to test the vynn_core package functionality.
 
 import sys
 import logging
+import traceback
 from datetime import datetime
 from pprint import pprint
 
@@ -125,7 +126,6 @@ def test_article_operations():
             
     except Exception as e:
         print(f"❌ Error testing article operations: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -165,7 +165,6 @@ def test_pydantic_model():
         
     except Exception as e:
         print(f"❌ Error testing Pydantic model: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
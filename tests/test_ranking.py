@@ -0,0 +1,24 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from vynn_core.feed import ranking
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+ARTICLES = [
+    {"quality": {"llmScore": 0.8}, "publishedAt": NOW - timedelta(hours=2)},
+    {"quality": {"llmScore": 0.5}, "publishedAt": NOW},
+    {"quality": {"llmScore": 0.9}},
+    {"publishedAt": NOW - timedelta(minutes=5)},
+    {"quality": {}, "publishedAt": "2024-12-31T00:00:00"},
+]
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_compute_scores_batch_matches_compute_score(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(ranking, "np", None)
+    now_ts = NOW.timestamp()
+    expected = [ranking.compute_score(a, "user", now_ts) for a in ARTICLES]
+    assert ranking.compute_scores_batch(ARTICLES, now_ts) == pytest.approx(expected)
+    assert ranking.compute_scores_batch([], now_ts) == []
@@ -13,18 +13,23 @@ __version__ = "0.1.0"
 # Import core functionality for easy access
 from .models import Article
 from .db.mongo import init_indexes, test_connection
-from .dao.articles import upsert_articles, get_articles_by_ids, find_recent, get_article_by_url
-from .utils.hashing import url_hash
+from .dao.articles import FEED_PROJECTION, upsert_articles, upsert_articles_iter, get_articles_by_ids, find_recent, iter_recent, get_article_by_url, get_articles_by_urls
+from .utils.hashing import url_hash, url_hashes
 from .utils.time import utc_now
 
 __all__ = [
     "Article",
     "init_indexes", 
     "test_connection",
+    "FEED_PROJECTION",
     "upsert_articles",
+    "upsert_articles_iter",
     "get_articles_by_ids", 
     "find_recent",
+    "iter_recent",
     "get_article_by_url",
+    "get_articles_by_urls",
     "url_hash",
+    "url_hashes",
     "utc_now"
 ]
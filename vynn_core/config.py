@@ -1,5 +1,57 @@
 import os
+from dotenv import find_dotenv, load_dotenv
+
+# Locate and load the project's .env once per process. The resolved path is kept in
+# the environment, so re-imports and module reloads skip the upward filesystem walk.
+DOTENV_PATH = os.environ.get("_VYNN_DOTENV_PATH")
+if DOTENV_PATH is None:
+    DOTENV_PATH = find_dotenv(usecwd=True)
+    if DOTENV_PATH:
+        load_dotenv(DOTENV_PATH)
+    os.environ["_VYNN_DOTENV_PATH"] = DOTENV_PATH
 
 # Database configuration - loaded from .env file
 MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB = os.getenv("MONGO_DB")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# MongoClient tuning; unset values fall back to MONGO_URI options / driver defaults.
+# Compressors default to whichever of zstd, snappy, zlib are installed.
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS")
+MONGO_MAX_POOL_SIZE = int(os.environ["MONGO_MAX_POOL_SIZE"]) if os.getenv("MONGO_MAX_POOL_SIZE") else None
+MONGO_MIN_POOL_SIZE = int(os.environ["MONGO_MIN_POOL_SIZE"]) if os.getenv("MONGO_MIN_POOL_SIZE") else None
+
+# urlHash digest: "sha256" (matches existing data) or "xxh3" (128-bit xxHash3, needs the
+# xxhash package). To switch, stop all writers, run backfill_url_hashes() on each
+# collection, then restart them with the new setting.
+URL_HASH_ALGORITHM = os.getenv("VYNN_HASH", "sha256")
+
+# How urlHash is stored in MongoDB: "hex" strings (matches existing data) or "binary"
+# raw digests, which halve the urlHash_unique index. Documents read back then carry a
+# bytes urlHash (upsert_articles accepts either form); hash lists the DAO returns, such
+# as skipped, stay hex. Switch the same way as VYNN_HASH, via backfill_url_hashes().
+URL_HASH_FORMAT = os.getenv("VYNN_HASH_FORMAT", "hex")
+
+# Threads upsert_articles spreads large batches over, each running its own bulk_writes.
+# 1 keeps upserts serial; 4-8 suits a typical Atlas primary.
+UPSERT_WORKERS = int(os.getenv("VYNN_UPSERT_WORKERS", "1"))
+
+# Serialize Article by copying its field dict instead of model_dump(). Nested
+# entities/quality containers are then shared with the model, not copied.
+FAST_DUMP = os.getenv("VYNN_FAST_DUMP") == "1"
+
+def validate_config() -> dict:
+    """Report which .env file was loaded and which settings are present (secrets are not echoed)."""
+    return {
+        "dotenv_path": DOTENV_PATH or None,
+        "MONGO_URI": "set" if MONGO_URI else "missing",
+        "MONGO_DB": MONGO_DB or "missing",
+        "REDIS_URL": "set" if os.getenv("REDIS_URL") else "default",
+        "MONGO_COMPRESSORS": MONGO_COMPRESSORS or "default",
+        "MONGO_MAX_POOL_SIZE": MONGO_MAX_POOL_SIZE or "default",
+        "MONGO_MIN_POOL_SIZE": MONGO_MIN_POOL_SIZE or "default",
+        "VYNN_HASH": URL_HASH_ALGORITHM,
+        "VYNN_HASH_FORMAT": URL_HASH_FORMAT,
+        "VYNN_FAST_DUMP": FAST_DUMP,
+        "VYNN_UPSERT_WORKERS": UPSERT_WORKERS,
+    }
@@ -1,163 +1,645 @@
-from ..db.mongo import get_db
+from ..db.mongo import get_collection, init_indexes
+from ..db.redis import get_redis_client
+from ..config import UPSERT_WORKERS
 from ..models import Article
-from ..utils.time import utc_now
-from ..utils.hashing import url_hash
-from pymongo.errors import DuplicateKeyError
-from typing import List, Dict, Union
+from ..utils.time import utc_now, to_datetime
+from ..utils.hashing import url_hash, url_hashes, to_stored_hash, from_stored_hash
+from pymongo import DESCENDING, UpdateOne, WriteConcern
+from pymongo.errors import BulkWriteError
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple, Union
 from bson import ObjectId
+from bson.errors import InvalidId
+import copy
 import logging
-from datetime import timedelta
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from datetime import datetime, timedelta
+from itertools import islice
 
 logger = logging.getLogger(__name__)
 
-def upsert_articles(docs: List[Union[dict, Article]], collection_name: str) -> Dict[str, List[str]]:
+# Upserts per bulk_write call; keeps each write command well under the 16MB limit
+BULK_CHUNK_SIZE = 1000
+
+# Redis SETs of urlHashes recently written, one per database.collection and period;
+# consulted by upserts with skip_seen=True. A hash is remembered for one to two periods.
+SEEN_URL_HASHES_PREFIX = "seen:urlhash"
+SEEN_PERIOD_SECONDS = 24 * 3600
+
+# Short-lived cache of find_recent results; absorbs bursts of identical feed queries
+RECENT_CACHE_TTL = 2.0
+_RECENT_CACHE_MAXSIZE = 128
+_recent_cache = {}
+# Upsert worker threads clear the cache while readers evict from it
+_recent_cache_lock = Lock()
+
+# Fields a feed card needs; pass as projection to skip summaries and other wide fields.
+# publishedAt and quality.llmScore are what feed.ranking scores on; urlHash dedupes cards.
+FEED_PROJECTION = {"title": 1, "url": 1, "urlHash": 1, "source": 1, "publish_date": 1, "publishedAt": 1,
+                   "image": 1, "quality.llmScore": 1}
+
+# Documents per getMore on streaming cursors: fewer round trips than the driver's
+# 101-doc first batch, while client memory stays bounded by one batch
+CURSOR_BATCH_SIZE = 500
+
+# Index the recent-news queries are pinned to with hint(); also their sort order,
+# with _id breaking publish_date ties so keyset pages never skip or repeat articles
+_PUBLISH_DATE_INDEX = [("publish_date", DESCENDING), ("_id", DESCENDING)]
+
+# Collections whose indexes have been ensured by this process, and those where that succeeded
+_indexed_collections = set()
+_indexes_ready = set()
+
+def _ensure_indexes(collection_name: str) -> None:
+    """Create the article indexes once per collection so urlHash lookups never COLLSCAN."""
+    if collection_name in _indexed_collections:
+        return
+    # Mark first so a failing index build (e.g. pre-existing duplicates) is not retried per call
+    _indexed_collections.add(collection_name)
+    try:
+        init_indexes(collection_name)
+        _indexes_ready.add(collection_name)
+    except Exception as e:
+        logger.warning("Could not ensure indexes on %s: %s", collection_name, e)
+
+def backfill_url_hashes(collection_name: str, batch_size: int = BULK_CHUNK_SIZE) -> int:
+    """
+    Recompute urlHash for every stored article with the configured hasher (VYNN_HASH)
+    and storage format (VYNN_HASH_FORMAT).
+    
+    Run once per collection after switching either setting; documents whose hash is
+    already current are left alone. Returns the number of documents rewritten.
+    
+    Stop every writer before running it and restart them on the new setting afterwards:
+    a process still on the old setting misses already-rewritten rows and inserts
+    duplicates. Documents whose new hash collides with another stored document (e.g. a
+    utm-variant URL stored under its own hash) are logged and left unchanged.
+    """
+    collection = get_collection(collection_name)
+    rewritten = 0
+    collisions = []
+    cursor = collection.find({"url": {"$type": "string"}}, {"url": 1, "urlHash": 1}).batch_size(batch_size)
+    
+    while True:
+        batch = list(islice(cursor, batch_size))
+        if not batch:
+            break
+        stale = [
+            (doc["_id"], stored)
+            for doc, stored in zip(batch, map(to_stored_hash, url_hashes([doc["url"] for doc in batch])))
+            if doc.get("urlHash") != stored
+        ]
+        if not stale:
+            continue
+        try:
+            rewritten += collection.bulk_write(
+                [UpdateOne({"_id": _id}, {"$set": {"urlHash": stored}}) for _id, stored in stale], ordered=False
+            ).modified_count
+        except BulkWriteError as bwe:
+            # Unordered: everything but the colliding updates was applied
+            rewritten += bwe.details.get("nModified", 0)
+            collisions.extend(stale[error["index"]][0] for error in bwe.details.get("writeErrors", []))
+    
+    if collisions:
+        logger.warning("backfill_url_hashes: left %d documents in %s unchanged, their new urlHash "
+                       "is already taken: %s", len(collisions), collection_name, collisions)
+    logger.info("backfill_url_hashes: rewrote %d urlHash values in %s", rewritten, collection_name)
+    return rewritten
+
+def migrate_publish_dates(collection_name: str, batch_size: int = BULK_CHUNK_SIZE) -> int:
+    """
+    Convert legacy ISO-string publish_date values to BSON dates in place.
+    
+    Date-typed queries (find_recent, get_last_n_hours_news) no longer match string
+    values, so run this once per collection. Returns the number of documents converted.
+    """
+    collection = get_collection(collection_name)
+    converted = 0
+    cursor = collection.find({"publish_date": {"$type": "string"}}, {"publish_date": 1}).batch_size(batch_size)
+    
+    while True:
+        batch = list(islice(cursor, batch_size))
+        if not batch:
+            break
+        ops = []
+        for doc in batch:
+            try:
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"publish_date": to_datetime(doc["publish_date"])}}))
+            except ValueError:
+                logger.warning("Unparseable publish_date %r on %s", doc["publish_date"], doc["_id"])
+        if ops:
+            converted += collection.bulk_write(ops, ordered=False).modified_count
+    
+    logger.info("migrate_publish_dates: converted %d documents in %s", converted, collection_name)
+    return converted
+
+def _upsert_collection(collection_name: str, ack: bool):
+    """Collection handle for upserts, switched to w=0 for unacknowledged ingest."""
+    _ensure_indexes(collection_name)
+    collection = get_collection(collection_name)
+    if not ack:
+        collection = collection.with_options(write_concern=WriteConcern(w=0))
+    return collection
+
+def _seen_keys(collection) -> List[str]:
+    """Seen-set keys for the collection: the current period first, then the previous one."""
+    period = int(time.time() // SEEN_PERIOD_SECONDS)
+    # full_name is "<database>.<collection>", so databases sharing one Redis stay separate
+    return [f"{SEEN_URL_HASHES_PREFIX}:{collection.full_name}:{p}" for p in (period, period - 1)]
+
+def _filter_seen(collection, unique: Dict[str, dict], skipped: List[str]) -> None:
+    """Drop articles whose urlHash is in the collection's seen sets (one round trip per chunk)."""
+    candidates = list(unique)
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        for key in _seen_keys(collection):
+            pipe.smismember(key, candidates)
+        current, previous = pipe.execute()
+    except Exception as e:
+        # The seen set is only an optimization: write everything when Redis is unavailable
+        logger.warning("Seen-set lookup failed, upserting all articles: %s", e)
+        return
+    for hash_value, seen_now, seen_before in zip(candidates, current, previous):
+        if seen_now or seen_before:
+            del unique[hash_value]
+            skipped.append(hash_value)
+
+def _mark_seen(collection, hashes: List[str]) -> None:
+    """Record written urlHashes so later skip_seen upserts can short-circuit them."""
+    if not hashes:
+        return
+    key = _seen_keys(collection)[0]
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        pipe.sadd(key, *hashes)
+        # Outlives its own period so lookups in the next one still see it
+        pipe.expire(key, 2 * SEEN_PERIOD_SECONDS)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Could not record %d urlHashes in the seen set: %s", len(hashes), e)
+
+def _batch_hashes(docs: List[Union[dict, Article]]) -> List[Optional[str]]:
+    """
+    urlHash of every document, hashing the URL column in one url_hashes call.
+    
+    None marks documents with neither urlHash nor a usable url; preparation skips them.
+    """
+    hashes, missing, missing_urls = [], [], []
+    for doc in docs:
+        try:
+            if isinstance(doc, Article):
+                hash_value, url = doc.urlHash, doc.url
+            else:
+                # Documents read back under VYNN_HASH_FORMAT=binary carry a bytes urlHash
+                hash_value, url = from_stored_hash(doc.get("urlHash")), doc.get("url")
+        except Exception:
+            hash_value = url = None
+        if not hash_value and url and isinstance(url, str):
+            missing.append(len(hashes))
+            missing_urls.append(url)
+        hashes.append(hash_value or None)
+    for i, hash_value in zip(missing, url_hashes(missing_urls)):
+        hashes[i] = hash_value
+    return hashes
+
+def _upsert_chunk(collection, chunk: List[Union[dict, Article]], now, ack: bool,
+                  resolve_ids: bool = True, skip_seen: bool = False,
+                  hashes_in: Optional[List[Optional[str]]] = None) -> Dict[str, Any]:
+    """
+    Prepare and bulk-write one chunk of articles in a single unordered bulk_write.
+    
+    hashes_in, when given, holds each document's urlHash from _batch_hashes; the
+    partitioned path computes it up front, otherwise it is computed here.
+    """
+    created, updated, skipped = [], [], []
+    result = {"created": created, "updated": updated, "skipped": skipped, "submitted": 0}
+    
+    # Columnar prep: the hash column is filled in one pass (one url_hashes call)
+    prepared, prepared_hashes = [], []
+    ops, hashes, stored_hashes = [], [], []
+    if hashes_in is None:
+        hashes_in = _batch_hashes(chunk)
+    
+    # Dump every Article model in the chunk with a single serializer call
+    dumped = iter(Article.to_mongo_dicts([d for d in chunk if isinstance(d, Article)]))
+    
+    for doc, hash_value in zip(chunk, hashes_in):
+        # Article dumps are fresh dicts; plain dicts are only read, never mutated
+        doc_dict = next(dumped) if isinstance(doc, Article) else doc
+        if not hash_value:
+            skipped.append("unknown")
+            logger.error("Error preparing article for upsert: article has neither url nor urlHash")
+            continue
+        prepared.append(doc_dict)
+        prepared_hashes.append(hash_value)
+    
+    # Collapse repeated URLs (last occurrence wins); two unordered upserts on the
+    # same urlHash would otherwise race into a duplicate key error
+    unique = dict(zip(prepared_hashes, prepared))
+    if len(unique) < len(prepared):
+        logger.debug("Collapsed %d duplicate articles in batch", len(prepared) - len(unique))
+    
+    if skip_seen and unique:
+        _filter_seen(collection, unique, skipped)
+    
+    for hash_value, doc_dict in unique.items():
+        try:
+            stored = to_stored_hash(hash_value)
+        except (ValueError, TypeError):
+            # Caller-supplied urlHash that is not a hex digest cannot be stored as binary
+            skipped.append(hash_value)
+            logger.error("Invalid urlHash %r for binary storage", hash_value)
+            continue
+        # Build the $set payload directly; createdAt only ever goes through $setOnInsert
+        set_fields = {k: v for k, v in doc_dict.items() if k != "createdAt"}
+        set_fields["urlHash"] = stored
+        set_fields["updatedAt"] = now
+        # Store publish_date as a BSON date so range queries and sorts compare dates, not strings
+        if isinstance(set_fields.get("publish_date"), str):
+            try:
+                set_fields["publish_date"] = to_datetime(set_fields["publish_date"])
+            except ValueError:
+                logger.warning("Unparseable publish_date %r for article %s", set_fields["publish_date"], hash_value)
+        
+        ops.append(UpdateOne(
+            {"urlHash": stored},
+            {
+                "$set": set_fields,
+                "$setOnInsert": {"createdAt": doc_dict.get("createdAt") or now}
+            },
+            upsert=True
+        ))
+        hashes.append(hash_value)
+        stored_hashes.append(stored)
+    
+    if not ops:
+        return result
+    
+    if not ack:
+        try:
+            collection.bulk_write(ops, ordered=False)
+            result["submitted"] = len(ops)
+            find_recent.cache_clear()
+            # w=0 never confirms the writes: marking them seen would permanently skip
+            # any that failed server-side, so unacknowledged upserts only read the set
+        except Exception as e:
+            skipped.extend(hashes)
+            logger.error("Error submitting batch of %d articles: %s", len(ops), e)
+        return result
+    
+    try:
+        raw = collection.bulk_write(ops, ordered=False).bulk_api_result
+    except BulkWriteError as bwe:
+        # Unordered: every other operation in the batch was still applied
+        raw = bwe.details
+    except Exception as e:
+        skipped.extend(hashes)
+        logger.error("Error upserting batch of %d articles: %s", len(ops), e)
+        return result
+    
+    failed = set()
+    for error in raw.get("writeErrors", []):
+        index = error["index"]
+        failed.add(index)
+        skipped.append(hashes[index])
+        if error.get("code") == 11000:
+            logger.debug("Duplicate key error for article: %s", unique[hashes[index]].get("title", "Unknown"))
+        else:
+            logger.error("Error upserting article %s: %s", unique[hashes[index]].get("title", "Unknown"), error.get("errmsg"))
+    
+    for error in raw.get("writeConcernErrors", []):
+        # Applied on the primary but not confirmed at the requested write concern
+        logger.warning("Write concern error during article upsert: %s", error.get("errmsg"))
+    
+    upserted = {u["_id"] for u in raw.get("upserted", [])}
+    for _id in upserted:
+        created.append(str(_id))
+    
+    # bulk_write does not report _ids of matched documents, so resolve them
+    # for the whole chunk in a single _id-only query (skipped entirely when
+    # nothing matched). updatedAt always changes, so every matched document
+    # is also a modified one.
+    if raw.get("nMatched") and not resolve_ids:
+        # Caller only needs an identifier: report matched articles by urlHash, no extra query
+        upserted_indexes = {u["index"] for u in raw.get("upserted", [])}
+        updated.extend(h for i, h in enumerate(hashes) if i not in failed and i not in upserted_indexes)
+    elif raw.get("nMatched"):
+        pending = [h for i, h in enumerate(stored_hashes) if i not in failed]
+        for existing in collection.find({"urlHash": {"$in": pending}}, {"_id": 1}):
+            if existing["_id"] not in upserted:
+                updated.append(str(existing["_id"]))
+    
+    # Drop cached feed pages so new and edited articles show up immediately
+    if created or updated:
+        find_recent.cache_clear()
+    if skip_seen:
+        _mark_seen(collection, [h for i, h in enumerate(hashes) if i not in failed])
+    return result
+
+def _upsert_chunks(collection, docs: List[Union[dict, Article]], now, ack: bool,
+                   resolve_ids: bool, skip_seen: bool,
+                   hashes_in: Optional[List[Optional[str]]] = None) -> Dict[str, Any]:
+    """Write docs as consecutive BULK_CHUNK_SIZE bulk_writes and merge the chunk results."""
+    created, updated, skipped = [], [], []
+    submitted = 0
+    for start in range(0, len(docs), BULK_CHUNK_SIZE):
+        end = start + BULK_CHUNK_SIZE
+        result = _upsert_chunk(collection, docs[start:end], now, ack, resolve_ids, skip_seen,
+                               hashes_in[start:end] if hashes_in is not None else None)
+        created.extend(result["created"])
+        updated.extend(result["updated"])
+        skipped.extend(result["skipped"])
+        submitted += result["submitted"]
+    return {"created": created, "updated": updated, "skipped": skipped, "submitted": submitted}
+
+def _upsert_partitioned(collection, docs: List[Union[dict, Article]], now, ack: bool,
+                        resolve_ids: bool, skip_seen: bool, workers: int) -> Dict[str, Any]:
+    """
+    Spread docs over worker threads, each running its own unordered bulk_writes.
+    
+    Partitioning is by urlHash, so every copy of an article goes to one worker and is
+    still collapsed or applied in order there; workers never race on the same key.
+    """
+    partitions = [([], []) for _ in range(workers)]
+    # Hashed once here; workers reuse these instead of hashing their docs again
+    for doc, hash_value in zip(docs, _batch_hashes(docs)):
+        part_docs, part_hashes = partitions[hash(hash_value) % workers]
+        part_docs.append(doc)
+        part_hashes.append(hash_value)
+    
+    created, updated, skipped = [], [], []
+    submitted = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(lambda part: _upsert_chunks(collection, part[0], now, ack, resolve_ids, skip_seen, part[1]),
+                               [p for p in partitions if p[0]]):
+            created.extend(result["created"])
+            updated.extend(result["updated"])
+            skipped.extend(result["skipped"])
+            submitted += result["submitted"]
+    return {"created": created, "updated": updated, "skipped": skipped, "submitted": submitted}
+
+def upsert_articles(docs: List[Union[dict, Article]], collection_name: str, *, ack: bool = True,
+                    resolve_ids: bool = True, skip_seen: bool = False,
+                    workers: Optional[int] = None) -> Dict[str, Any]:
     """
     Upsert articles to MongoDB. Returns counts of created, updated, and skipped articles.
     
+    Articles are sent as unordered ``bulk_write`` batches of ``UpdateOne`` upserts,
+    so a batch costs one round trip per chunk instead of one (or two) per article.
+    
     Args:
         docs: List of article dictionaries or Article models
         collection_name: Name of the MongoDB collection to save to (default: "articles")
+        ack: When False, write with ``w=0`` (fire-and-forget ingest). The server reports
+             nothing back, so only counts are returned.
+        resolve_ids: When False, updated articles are reported by urlHash instead of
+                     ObjectId, saving the per-chunk _id lookup query.
+        skip_seen: When True, articles whose urlHash is in this collection's Redis seen
+                   set (written within the last one to two SEEN_PERIOD_SECONDS) are
+                   reported as skipped without touching MongoDB, and written ones are
+                   added to it. Edits to already-seen articles are not applied, so use
+                   this for re-ingesting feeds, not for updates. With ack=False the set is
+                   only read, since unconfirmed writes are never marked seen.
+        workers: Threads to spread batches larger than BULK_CHUNK_SIZE over, partitioned
+                 by urlHash (default: VYNN_UPSERT_WORKERS). Result lists are then grouped
+                 by worker rather than in input order.
         
     Returns:
-        Dict with keys: created, updated, skipped (each containing list of ObjectId strings)
+        Dict with keys: created, updated, skipped (each containing list of ObjectId strings),
+        or with ack=False: submitted, skipped (counts)
     """
-    db = get_db()
-    collection = db[collection_name]
-    created, updated, skipped = [], [], []
+    collection = _upsert_collection(collection_name, ack)
+    # One timestamp for the whole batch
+    now = utc_now()
     
-    for doc in docs:
-        try:
-            # Convert Article model to dict if needed
-            if isinstance(doc, Article):
-                doc_dict = doc.to_mongo_dict()
-            else:
-                doc_dict = doc.copy()
-            
-            # Ensure urlHash is present
-            if not doc_dict.get("urlHash"):
-                doc_dict["urlHash"] = url_hash(doc_dict["url"])
-            
-            # Set timestamps
-            now = utc_now()
-            doc_dict.setdefault("createdAt", now)
-            doc_dict["updatedAt"] = now
-            
-            # Upsert operation
-            result = collection.update_one(
-                {"urlHash": doc_dict["urlHash"]},
-                {
-                    "$set": {k: v for k, v in doc_dict.items() if k != "createdAt"},
-                    "$setOnInsert": {"createdAt": doc_dict["createdAt"]}
-                },
-                upsert=True
-            )
-            
-            if result.upserted_id:
-                created.append(str(result.upserted_id))
-                logger.info(f"Created article: {doc_dict.get('title', 'Unknown')}")
-            elif result.modified_count > 0:
-                # Find the updated document
-                existing = collection.find_one({"urlHash": doc_dict["urlHash"]})
-                if existing:
-                    updated.append(str(existing["_id"]))
-                    logger.info(f"Updated article: {doc_dict.get('title', 'Unknown')}")
-            else:
-                skipped.append(doc_dict["urlHash"])
-                logger.debug(f"Skipped article (no changes): {doc_dict.get('title', 'Unknown')}")
-                
-        except DuplicateKeyError:
-            skipped.append(doc_dict.get("urlHash", "unknown"))
-            logger.warning(f"Duplicate key error for article: {doc_dict.get('title', 'Unknown')}")
-        except Exception as e:
-            skipped.append(doc_dict.get("urlHash", "unknown"))
-            logger.error(f"Error upserting article {doc_dict.get('title', 'Unknown')}: {e}")
+    # No point fanning out a batch that fits in a single bulk_write
+    workers = min(UPSERT_WORKERS if workers is None else workers, -(-len(docs) // BULK_CHUNK_SIZE))
+    if workers > 1:
+        result = _upsert_partitioned(collection, docs, now, ack, resolve_ids, skip_seen, workers)
+    else:
+        result = _upsert_chunks(collection, docs, now, ack, resolve_ids, skip_seen)
+    created, updated, skipped, submitted = result["created"], result["updated"], result["skipped"], result["submitted"]
     
+    if not ack:
+        logger.info("upsert_articles: submitted=%d skipped=%d (unacknowledged)", submitted, len(skipped))
+        return {"submitted": submitted, "skipped": len(skipped)}
+    logger.info("upsert_articles: created=%d updated=%d skipped=%d", len(created), len(updated), len(skipped))
     return {"created": created, "updated": updated, "skipped": skipped}
 
-def get_articles_by_ids(ids: List[str], collection_name: str) -> List[dict]:
-    """Get articles by their MongoDB ObjectId strings."""
-    db = get_db()
-    collection = db[collection_name]
+def upsert_articles_iter(docs: Iterable[Union[dict, Article]], collection_name: str,
+                         chunk_size: int = BULK_CHUNK_SIZE, *, ack: bool = True,
+                         resolve_ids: bool = True, skip_seen: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Stream articles into MongoDB one bulk_write chunk at a time.
+    
+    Reads ``chunk_size`` documents from any iterable, writes them, and yields that
+    chunk's result (same shape as upsert_articles) before reading the next, so peak
+    memory is bounded by the chunk rather than the whole ingest.
+    """
+    collection = _upsert_collection(collection_name, ack)
+    docs = iter(docs)
+    
+    while True:
+        chunk = list(islice(docs, chunk_size))
+        if not chunk:
+            return
+        result = _upsert_chunk(collection, chunk, utc_now(), ack, resolve_ids, skip_seen)
+        if ack:
+            yield {"created": result["created"], "updated": result["updated"], "skipped": result["skipped"]}
+        else:
+            yield {"submitted": result["submitted"], "skipped": len(result["skipped"])}
+
+def _to_object_id(id_str: str) -> Optional[ObjectId]:
+    """Parse an ObjectId string once; None if it is not a valid id."""
+    if id_str is None:
+        # ObjectId(None) would mint a brand-new id rather than fail
+        return None
+    try:
+        return ObjectId(id_str)
+    except (InvalidId, TypeError):
+        return None
+
+def get_articles_by_ids(ids: List[str], collection_name: str, projection: Optional[dict] = None) -> List[dict]:
+    """
+    Get articles by their MongoDB ObjectId strings.
+    
+    Pass a projection (e.g. ``{"title": 1, "urlHash": 1, "publishedAt": 1, "source": 1}``)
+    to skip large fields such as ``summary`` when only a few fields are needed.
+    """
+    collection = get_collection(collection_name)
     try:
-        object_ids = [ObjectId(id_str) for id_str in ids if ObjectId.is_valid(id_str)]
-        return list(collection.find({"_id": {"$in": object_ids}}))
+        object_ids = [oid for oid in map(_to_object_id, ids) if oid is not None]
+        return list(collection.find({"_id": {"$in": object_ids}}, projection))
     except Exception as e:
         logger.error(f"Error fetching articles by IDs: {e}")
         return []
 
-def find_recent(collection_name: str, limit: int = 50, before_date: str = None) -> List[dict]:
+def _keyset_query(cursor: Tuple[Union[str, datetime], Any]) -> dict:
+    """Filter for articles strictly after (last_date, last_id) in newest-first order."""
+    last_date, last_id = cursor
+    last_date = to_datetime(last_date)
+    if isinstance(last_id, str):
+        last_id = ObjectId(last_id)
+    return {"$or": [
+        {"publish_date": {"$lt": last_date}},
+        {"publish_date": last_date, "_id": {"$lt": last_id}},
+    ]}
+
+def iter_recent(collection_name: str, limit: int = 50, before_date: Union[str, datetime] = None,
+                projection: Optional[dict] = None,
+                cursor: Optional[Tuple[Union[str, datetime], Any]] = None) -> Iterator[dict]:
+    """
+    Stream recent articles straight from the cursor, newest first.
+    
+    Takes the same arguments as find_recent, but nothing is materialized or cached:
+    callers that stop early (e.g. pagination) only fetch and decode the batches they
+    consume. Query errors surface while iterating.
+    """
+    _ensure_indexes(collection_name)
+    collection = get_collection(collection_name)
+    query = _keyset_query(cursor) if cursor else {}
+    
+    # Filter by date if provided
+    if before_date:
+        query["publish_date"] = {"$lt": to_datetime(before_date)}
+    
+    results = collection.find(query, projection).sort(_PUBLISH_DATE_INDEX).limit(limit).batch_size(min(limit, CURSOR_BATCH_SIZE))
+    # Skip query planning; only safe once the index is known to exist
+    if collection_name in _indexes_ready:
+        results = results.hint(_PUBLISH_DATE_INDEX)
+    return results
+
+def find_recent(collection_name: str, limit: int = 50, before_date: Union[str, datetime] = None,
+                projection: Optional[dict] = None,
+                cursor: Optional[Tuple[Union[str, datetime], Any]] = None) -> List[dict]:
     """
     Find recent articles, optionally filtered by date and source.
     
     Args:
         limit: Maximum number of articles to return (default: 50)
-        before_date: ISO format timestamp string (e.g., "2025-10-29T18:06:29.275930"). 
-                     Returns only articles published before this date.
+        before_date: datetime or ISO format timestamp string (e.g., "2025-10-29T18:06:29.275930",
+                     naive values are UTC). Returns only articles published before this date.
         source: Filter by article source (optional)
         collection_name: Name of the MongoDB collection (default: "articles")
+        projection: Fields to return, e.g. FEED_PROJECTION. Returns full documents when omitted.
+        cursor: (publish_date, _id) of the last article on the previous page; returns the
+                articles after it. Each page is an index seek, however deep the pagination.
         
     Returns:
-        List of article documents sorted by publish_date in descending order
+        List of article documents sorted by publish_date, then _id, in descending order
     """
-    db = get_db()
-    collection = db[collection_name]
+    key = (collection_name, limit, before_date, repr(sorted(projection.items())) if projection else None,
+           cursor and (cursor[0], str(cursor[1])))
+    cached = _recent_cache.get(key)
+    if cached and time.monotonic() - cached[0] < RECENT_CACHE_TTL:
+        # Hand out copies so callers mutating results cannot poison the cache
+        return copy.deepcopy(cached[1])
+    
     try:
-        query = {}
-        
-        # Filter by date if provided
-        if before_date:
-            query["publish_date"] = {"$lt": before_date}
-            
-        return list(collection.find(query).sort("publish_date", -1).limit(limit))
+        results = list(iter_recent(collection_name, limit, before_date, projection, cursor))
     except Exception as e:
         logger.error(f"Error fetching recent articles: {e}")
         return []
+    
+    entry = (time.monotonic(), copy.deepcopy(results))
+    with _recent_cache_lock:
+        # Refreshing an expired key reuses its slot instead of evicting a live entry
+        if key not in _recent_cache and len(_recent_cache) >= _RECENT_CACHE_MAXSIZE:
+            del _recent_cache[next(iter(_recent_cache))]
+        _recent_cache[key] = entry
+    return results
+
+def _clear_recent_cache() -> None:
+    with _recent_cache_lock:
+        _recent_cache.clear()
+
+find_recent.cache_clear = _clear_recent_cache
 
 def get_article_by_url(url: str, collection_name: str) -> dict:
     """Get article by URL (using urlHash for efficient lookup)."""
-    db = get_db()
-    collection = db[collection_name]
+    _ensure_indexes(collection_name)
+    collection = get_collection(collection_name)
     try:
         url_hash_value = url_hash(url)
-        return collection.find_one({"urlHash": url_hash_value})
+        return collection.find_one({"urlHash": to_stored_hash(url_hash_value)})
     except Exception as e:
         logger.error(f"Error fetching article by URL: {e}")
         return None
 
-def get_last_n_hours_news(collection_name: str, n_hours_ago: int) -> List[dict]:
+def get_articles_by_urls(urls: List[str], collection_name: str,
+                         projection: Optional[dict] = None) -> Dict[str, Optional[dict]]:
+    """
+    Get many articles by URL with a single urlHash $in query.
+    
+    Returns:
+        Dict mapping each requested URL to its article document, or None if not stored
+    """
+    _ensure_indexes(collection_name)
+    collection = get_collection(collection_name)
+    if projection is not None:
+        # urlHash is needed to map documents back to the requested URLs; MongoDB rejects
+        # mixing inclusions and exclusions, so only add it to inclusion projections
+        fields = [v for k, v in projection.items() if k != "_id"]
+        # An _id-only projection such as {"_id": 1} is an inclusion too
+        if any(fields) or (not fields and projection.get("_id")):
+            projection = {**projection, "urlHash": 1}
+        else:
+            projection = {k: v for k, v in projection.items() if k != "urlHash"}
+    try:
+        hashes = url_hashes(urls)
+        cursor = collection.find({"urlHash": {"$in": [to_stored_hash(h) for h in hashes]}}, projection)
+        by_hash = {from_stored_hash(doc["urlHash"]): doc for doc in cursor}
+    except Exception as e:
+        logger.error(f"Error fetching articles by URLs: {e}")
+        return {url: None for url in urls}
+    return {url: by_hash.get(h) for url, h in zip(urls, hashes)}
+
+def iter_last_n_hours_news(collection_name: str, n_hours_ago: int,
+                           projection: Optional[dict] = None) -> Iterator[dict]:
+    """
+    Stream articles from the last n hours straight from the cursor, newest first.
+    
+    Takes the same arguments as get_last_n_hours_news; documents are fetched in
+    CURSOR_BATCH_SIZE batches as the caller iterates. Query errors surface while iterating.
+    """
+    _ensure_indexes(collection_name)
+    collection = get_collection(collection_name)
+    # Get current UTC time and calculate cutoff
+    now = utc_now()
+    cutoff_datetime = now - timedelta(hours=n_hours_ago)
+
+    # publish_date is a BSON date, so the cutoff is passed as a datetime (not an ISO string)
+    query = {"publish_date": {"$gte": cutoff_datetime}}
+
+    if logger.isEnabledFor(logging.INFO):
+        # isoformat() both timestamps only when the line is actually emitted
+        logger.info("Fetching articles from last %s hours (cutoff: %s, current UTC: %s)",
+                    n_hours_ago, cutoff_datetime.isoformat(), now.isoformat())
+    cursor = collection.find(query, projection).sort(_PUBLISH_DATE_INDEX).batch_size(CURSOR_BATCH_SIZE)
+    if collection_name in _indexes_ready:
+        cursor = cursor.hint(_PUBLISH_DATE_INDEX)
+    return cursor
+
+def get_last_n_hours_news(collection_name: str, n_hours_ago: int, projection: Optional[dict] = None) -> List[dict]:
     """
     Get articles from the last n hours.
 
     Uses real-time UTC to calculate the cutoff time, ensuring it works correctly
-    in Docker containers and across different timezones.
+    in Docker containers and across different timezones. Use iter_last_n_hours_news
+    to process large windows without holding every document in memory.
     
     Args:
         collection_name: Name of the MongoDB collection
         n_hours: Number of hours to look back
+        projection: Fields to return, e.g. FEED_PROJECTION. Returns full documents when omitted.
         
     Returns:
         List of article documents from the last n hours, sorted by publish_date descending
     """
-    from datetime import timedelta
-    
-    db = get_db()
-    collection = db[collection_name]
     try:
-        # Get current UTC time and calculate cutoff
-        now = utc_now()
-        cutoff_datetime = now - timedelta(hours=n_hours_ago)
-        
-        # Format as ISO string without timezone suffix to match DB format
-        # Database stores: "2025-11-01T15:56:39.542998"
-        cutoff_time = cutoff_datetime.replace(tzinfo=None).isoformat()
-
-        # Query for articles published after the cutoff time
-        query = {"publish_date": {"$gte": cutoff_time}}
-
-        logger.info(f"Fetching articles from last {n_hours_ago} hours (cutoff: {cutoff_time}, current UTC: {now.replace(tzinfo=None).isoformat()})")
-        results = list(collection.find(query).sort("publish_date", -1))
-        logger.info(f"Found {len(results)} articles from last {n_hours_ago} hours")
-
+        results = list(iter_last_n_hours_news(collection_name, n_hours_ago, projection))
+        logger.info("Found %d articles from last %s hours", len(results), n_hours_ago)
         return results
     except Exception as e:
         logger.error(f"Error fetching last {n_hours_ago} hours news: {e}")
@@ -1,33 +1,79 @@
 from pymongo import MongoClient, ASCENDING, DESCENDING
-from ..config import MONGO_URI, MONGO_DB
+from ..config import MONGO_URI, MONGO_DB, MONGO_COMPRESSORS, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE
+from functools import lru_cache
 from threading import Lock
+from urllib.parse import parse_qsl, urlsplit
+from typing import List
+import importlib.util
 import logging
 
 logger = logging.getLogger(__name__)
 
+# lru_cache is the lock-free fast path, but it lets every caller that misses a cold cache
+# run the factory; the connect itself stays single-flight behind this lock
 _mongo_client = None
 _mongo_lock = Lock()
 
+# Indexes earlier versions created that no query uses any more
+_RETIRED_ARTICLE_INDEXES = ("publishedAt_source", "publishedAt_desc")
+
+def _uri_sets_compressors() -> bool:
+    """Whether MONGO_URI picks its own compressors (URI option names are case-insensitive)."""
+    # Read the query string directly: parse_uri would resolve mongodb+srv hosts over DNS
+    return any(key.lower() == "compressors" for key, _ in parse_qsl(urlsplit(MONGO_URI or "").query))
+
+def _client_options() -> dict:
+    """MongoClient keyword options from config; unset knobs are left to MONGO_URI and driver defaults."""
+    compressors = MONGO_COMPRESSORS
+    # Explicit kwargs override URI options, so the default only applies when the URI is silent
+    if compressors is None and not _uri_sets_compressors():
+        # Offer only compressors whose libraries are installed (pymongo warns about the rest);
+        # the server picks the first one it also supports. Article payloads are text-heavy.
+        compressors = ",".join(
+            name for name, module in (("zstd", "zstandard"), ("snappy", "snappy"), ("zlib", "zlib"))
+            if importlib.util.find_spec(module) is not None
+        )
+    options = {"compressors": compressors} if compressors else {}
+    if MONGO_MAX_POOL_SIZE is not None:
+        options["maxPoolSize"] = MONGO_MAX_POOL_SIZE
+    if MONGO_MIN_POOL_SIZE is not None:
+        options["minPoolSize"] = MONGO_MIN_POOL_SIZE
+    return options
+
+@lru_cache(maxsize=1)
 def get_mongo_client():
-    """Get singleton MongoDB client with connection pooling."""
+    """Get singleton MongoDB client with connection pooling (failed connects are not cached)."""
     global _mongo_client
-    if _mongo_client is None:
-        with _mongo_lock:
-            if _mongo_client is None:
-                try:
-                    _mongo_client = MongoClient(MONGO_URI)
-                    # Test connection
-                    _mongo_client.admin.command('ping')
-                    logger.info("MongoDB connection established successfully")
-                except Exception as e:
-                    logger.error(f"Failed to connect to MongoDB: {e}")
-                    raise
-    return _mongo_client
+    with _mongo_lock:
+        # Concurrent cold-start callers queue here; all but the first reuse its client
+        if _mongo_client is not None:
+            return _mongo_client
+        # Handles cached against a previous client must not outlive it
+        get_collection.cache_clear()
+        client = None
+        try:
+            client = MongoClient(MONGO_URI, **_client_options())
+            # Test connection
+            client.admin.command('ping')
+            logger.info("MongoDB connection established successfully")
+        except Exception as e:
+            logger.error(f"Failed to connect to MongoDB: {e}")
+            # Not cached, so release its monitor threads and sockets before the next retry
+            if client is not None:
+                client.close()
+            raise
+        _mongo_client = client
+        return client
 
 def get_db():
     """Get the configured database."""
     return get_mongo_client()[MONGO_DB]
 
+@lru_cache(maxsize=32)
+def get_collection(collection_name: str):
+    """Get a memoized Collection handle; cleared whenever a new client is created."""
+    return get_db()[collection_name]
+
 def init_indexes(collection_name: str = "articles"):
     """Initialize database indexes. Safe to call multiple times (idempotent)."""
     try:
@@ -43,17 +89,11 @@ def init_indexes(collection_name: str = "articles"):
             background=True
         )
         
-        # (publishedAt, source) compound index for efficient recent queries
-        collection.create_index(
-            [("publishedAt", DESCENDING), ("source", ASCENDING)], 
-            name="publishedAt_source",
-            background=True
-        )
-        
-        # publishedAt index for recent queries
+        # (publish_date, _id) index for find_recent / get_last_n_hours_news range queries and
+        # keyset pagination; its publish_date prefix replaces the old single-field index
         collection.create_index(
-            [("publishedAt", DESCENDING)], 
-            name="publishedAt_desc",
+            [("publish_date", DESCENDING), ("_id", DESCENDING)], 
+            name="pubdate_id_desc",
             background=True
         )
         
@@ -73,6 +113,22 @@ def init_indexes(collection_name: str = "articles"):
         logger.error(f"Failed to initialize indexes: {e}")
         raise
 
+def drop_retired_indexes(collection_name: str = "articles") -> List[str]:
+    """
+    Drop article indexes earlier versions created that no query uses any more.
+    
+    They only cost write amplification. Run once per collection as a migration;
+    init_indexes never drops anything, since every process runs it lazily.
+    Returns the names of the dropped indexes.
+    """
+    collection = get_db()[collection_name]
+    existing = collection.index_information()
+    dropped = [name for name in _RETIRED_ARTICLE_INDEXES if name in existing]
+    for name in dropped:
+        collection.drop_index(name)
+        logger.info(f"Dropped unused index {name} on {collection_name}")
+    return dropped
+
 def test_connection():
     """Test MongoDB connection and return database info."""
     try:
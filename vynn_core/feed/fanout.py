@@ -1,6 +1,13 @@
 from ..db.redis import get_redis_client
 
+# ZADDs buffered per pipeline round trip; bounds client memory on very large fan-outs
+FANOUT_BATCH_SIZE = 5000
+
 def push(article_id: str, user_ids: list[str], score: float = None):
     r = get_redis_client()
-    for uid in user_ids:
-        r.zadd(f"feed:{uid}", {article_id: score or 0})
+    member = {article_id: 0 if score is None else score}
+    pipe = r.pipeline(transaction=False)
+    for start in range(0, len(user_ids), FANOUT_BATCH_SIZE):
+        for uid in user_ids[start:start + FANOUT_BATCH_SIZE]:
+            pipe.zadd(f"feed:{uid}", member)
+        pipe.execute()
@@ -1,3 +1,8 @@
+try:
+    import numpy as np
+except ImportError:  # optional: pip install vynn_core[fast]
+    np = None
+
 def compute_score(article: dict, user_id: str, now_ts: float) -> float:
     # Example: score = llmScore * recency_decay
     llm_score = article.get("quality", {}).get("llmScore", 0)
@@ -8,3 +13,16 @@ def compute_score(article: dict, user_id: str, now_ts: float) -> float:
         age = 1
     recency_decay = 1.0 / age
     return llm_score * recency_decay
+
+def compute_scores_batch(articles: list[dict], now_ts: float) -> list[float]:
+    """Score many articles at once; element-wise equal to compute_score (the score is not per-user yet)."""
+    llm_scores = [a.get("quality", {}).get("llmScore", 0) for a in articles]
+    # Articles without a usable publishedAt get age 1, as in compute_score
+    published = [
+        p.timestamp() if hasattr(p, "timestamp") else now_ts - 1
+        for p in (a.get("publishedAt") for a in articles)
+    ]
+    if np is None:
+        return [llm / max(1, now_ts - ts) for llm, ts in zip(llm_scores, published)]
+    ages = np.maximum(1.0, now_ts - np.asarray(published, dtype=np.float64))
+    return (np.asarray(llm_scores, dtype=np.float64) / ages).tolist()
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+from .config import FAST_DUMP
 
 class Article(BaseModel):
     """Core article model for news feed system."""
@@ -22,15 +23,23 @@ class Article(BaseModel):
     def generate_url_hash(self):
         """Auto-generate urlHash if not provided."""
         if not self.urlHash:
-            from ..utils.hashing import url_hash
+            from .utils.hashing import url_hash
             self.urlHash = url_hash(self.url)
         return self
     
     def to_mongo_dict(self) -> dict:
         """Convert to MongoDB-ready dictionary."""
-        data = self.model_dump()
-        # Ensure datetime objects are properly serialized
-        for field in ['publishedAt', 'createdAt', 'updatedAt']:
-            if data.get(field) and hasattr(data[field], 'isoformat'):
-                data[field] = data[field]
-        return data
+        # datetimes stay native so they are stored as BSON dates
+        if FAST_DUMP:
+            # Fields are already validated; skip model_dump's schema walk
+            return self.__dict__.copy()
+        return self.model_dump()
+    
+    @staticmethod
+    def to_mongo_dicts(articles: List["Article"]) -> List[dict]:
+        """Convert many articles in one pydantic-core call; same output as to_mongo_dict()."""
+        if FAST_DUMP:
+            return [article.__dict__.copy() for article in articles]
+        return _ARTICLE_LIST_ADAPTER.dump_python(articles)
+
+_ARTICLE_LIST_ADAPTER = TypeAdapter(List[Article])
@@ -1,9 +1,82 @@
 import hashlib
+import re
+from functools import lru_cache
+from typing import List, Union
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from ..config import URL_HASH_ALGORITHM, URL_HASH_FORMAT
 
-def url_hash(url: str) -> str:
+def _sha256_hexdigest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+# urlHash is only a dedup key, so a non-cryptographic hash is enough once data is migrated
+if URL_HASH_ALGORITHM == "sha256":
+    _hexdigest = _sha256_hexdigest
+elif URL_HASH_ALGORITHM == "xxh3":
+    import xxhash
+    _hexdigest = xxhash.xxh3_128_hexdigest
+else:
+    raise ValueError(f"Unsupported VYNN_HASH algorithm: {URL_HASH_ALGORITHM!r} (use 'sha256' or 'xxh3')")
+
+if URL_HASH_FORMAT not in ("hex", "binary"):
+    raise ValueError(f"Unsupported VYNN_HASH_FORMAT: {URL_HASH_FORMAT!r} (use 'hex' or 'binary')")
+
+# Percent-escapes that parse_qsl decodes and urlencode re-encodes to the same text:
+# uppercase hex for the ASCII characters urlencode always escapes, i.e. everything
+# except letters, digits, "_.-~" and space
+_STABLE_ESCAPE = r"%(?:[01][0-9A-F]|2[1-9A-CF]|3[A-F]|[46]0|5[B-E]|7[B-DF])"
+_QUERY_TOKEN = rf"(?:[\w.~+\-]|{_STABLE_ESCAPE})+"
+
+# URLs that urlparse/urlunparse and parse_qsl/urlencode would hand back unchanged:
+# lowercase scheme, non-empty netloc, no ";params", and a query made only of
+# k=v pairs of unreserved characters and stable escapes. Anything else takes the
+# full parse path.
+_SIMPLE_URL_RE = re.compile(
+    r"(?P<base>[a-z][a-z0-9+.\-]*://[^/?#;\s\[\]]+(?:/[^?#;\s]*)?)"
+    rf"(?:\?(?P<query>{_QUERY_TOKEN}={_QUERY_TOKEN}(?:&{_QUERY_TOKEN}={_QUERY_TOKEN})*))?"
+    r"(?:#(?P<fragment>\S+))?",
+    re.ASCII,
+)
+_UTM_PARAM_RE = re.compile(r"(?:^|&)utm_[^&]*", re.IGNORECASE)
+
+def _canonicalize_slow(url: str) -> str:
     # Remove UTM params
     parsed = urlparse(url)
     query = [(k, v) for k, v in parse_qsl(parsed.query) if not k.lower().startswith("utm_")]
-    clean_url = urlunparse(parsed._replace(query=urlencode(query)))
-    return hashlib.sha256(clean_url.encode("utf-8")).hexdigest()
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+def _canonicalize(url: str) -> str:
+    match = _SIMPLE_URL_RE.fullmatch(url)
+    if match is None:
+        return _canonicalize_slow(url)
+    canonical, query, fragment = match.group("base", "query", "fragment")
+    if query:
+        # Every utm_ key contains "_", and most queries have none: skip the regex then
+        if "_" in query:
+            query = _UTM_PARAM_RE.sub("", query).lstrip("&")
+        if query:
+            canonical += "?" + query
+    if fragment:
+        canonical += "#" + fragment
+    return canonical
+
+# Repeat lookups (top stories, feed regeneration) hit the same URLs; the cache is
+# process-local, and the hasher is fixed at import, so entries never go stale
+@lru_cache(maxsize=131072)
+def url_hash(url: str) -> str:
+    return _hexdigest(_canonicalize(url).encode("utf-8"))
+
+def to_stored_hash(hash_value: str) -> Union[str, bytes]:
+    """urlHash as written to and queried in MongoDB; bytes are stored as BSON binary."""
+    return bytes.fromhex(hash_value) if URL_HASH_FORMAT == "binary" else hash_value
+
+def from_stored_hash(value: Union[str, bytes]) -> str:
+    """Hex urlHash for a value read back from MongoDB, in either storage format."""
+    return value.hex() if isinstance(value, bytes) else value
+
+def url_hashes(urls: List[str]) -> List[str]:
+    """Hash a batch of URLs in one call; each value matches url_hash(url).
+    
+    Uncached on purpose: ingest batches are mostly new URLs that would only churn url_hash's cache.
+    """
+    hexdigest, canonicalize = _hexdigest, _canonicalize
+    return [hexdigest(canonicalize(url).encode("utf-8")) for url in urls]
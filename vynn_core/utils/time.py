@@ -2,3 +2,10 @@ from datetime import datetime, timezone
 
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
+
+def to_datetime(value):
+    """Parse an ISO-8601 string (naive values are UTC) into a datetime; other values pass through."""
+    if isinstance(value, str):
+        # fromisoformat only accepts a "Z" suffix from Python 3.11 on
+        return datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    return value